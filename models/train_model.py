@@ -2,13 +2,17 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
 import joblib
 import os
+import argparse
+import queue
+import threading
 
 # Try to import TensorFlow; if not available, we'll fall back to scikit-learn
 TF_AVAILABLE = True
 try:
+    import tensorflow as tf
     from tensorflow.keras.models import Sequential
     from tensorflow.keras.layers import Dense, Dropout
     from tensorflow.keras.optimizers import Adam
@@ -17,7 +21,7 @@ try:
 except Exception:
     TF_AVAILABLE = False
     # Import sklearn fallback components
-    from sklearn.linear_model import LogisticRegression
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
     print("TensorFlow not available; will use scikit-learn LogisticRegression fallback for training.")
 
 # Resolve project root and data/model paths reliably
@@ -25,6 +29,19 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'ECG-Dataset.csv')
 MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
 
+COLUMN_NAMES = ['age','sex','smoker','years_of_smoking','LDL_cholesterol','chest_pain_type',
+                'height','weight', 'familyhist','activity', 'lifestyle', 'cardiac_intervention', 
+                'heart_rate', 'diabets', 'blood_pressure_sys', 'blood_pressure_dias', 
+                'hypertention', 'Interventricular_septal_end_diastole', 'ecg_pattern', 'Q_wave', 'target']
+N_FEATURES = len(COLUMN_NAMES) - 1
+
+# Defaults for the out-of-core (streaming) training mode
+STREAM_CHUNKSIZE = 10000
+STREAM_BUFFER_SIZE = 10000
+STREAM_BATCH_SIZE = 256
+STREAM_PREFETCH = 4
+VALIDATION_FRACTION = 0.2
+
 def load_and_preprocess_data():
     # Load data
     if not os.path.exists(DATA_PATH):
@@ -32,10 +49,7 @@ def load_and_preprocess_data():
     data = pd.read_csv(DATA_PATH)
     
     # Rename columns
-    data.columns = ['age','sex','smoker','years_of_smoking','LDL_cholesterol','chest_pain_type',
-                    'height','weight', 'familyhist','activity', 'lifestyle', 'cardiac_intervention', 
-                    'heart_rate', 'diabets', 'blood_pressure_sys', 'blood_pressure_dias', 
-                    'hypertention', 'Interventricular_septal_end_diastole', 'ecg_pattern', 'Q_wave', 'target']
+    data.columns = COLUMN_NAMES
     
     # Split features and target
     X = data.drop('target', axis=1)
@@ -56,6 +70,130 @@ def load_and_preprocess_data():
     
     return X_train, X_test, y_train, y_test
 
+def _read_chunks(chunksize):
+    """
+    Yield (chunk, row_ids) pairs from the dataset without loading it whole.
+    Row IDs are the global row positions in the CSV.
+    """
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"Dataset not found at {DATA_PATH}. Run generate_synthetic_data.py or place the CSV in data/")
+    offset = 0
+    for chunk in pd.read_csv(DATA_PATH, header=0, names=COLUMN_NAMES, chunksize=chunksize):
+        row_ids = np.arange(offset, offset + len(chunk), dtype=np.int64)
+        offset += len(chunk)
+        yield chunk, row_ids
+
+def _is_validation(row_ids, validation_fraction):
+    """
+    Assign rows to the validation split by hashing their row IDs, so the
+    split is deterministic and needs no global shuffle.
+    """
+    buckets = pd.util.hash_array(row_ids) % 10000
+    return buckets < int(validation_fraction * 10000)
+
+def _split_chunks(validation, validation_fraction, chunksize):
+    # Yield (X, y) chunks belonging to either the training or validation split
+    for chunk, row_ids in _read_chunks(chunksize):
+        mask = _is_validation(row_ids, validation_fraction)
+        if not validation:
+            mask = ~mask
+        part = chunk[mask]
+        if len(part):
+            yield part.drop('target', axis=1), part['target']
+
+def fit_scaler_streaming(validation_fraction=VALIDATION_FRACTION, chunksize=STREAM_CHUNKSIZE):
+    """
+    Fit the StandardScaler on the training split in a single chunked pass
+    and save it alongside the model
+    """
+    sc = StandardScaler()
+    for X, _ in _split_chunks(False, validation_fraction, chunksize):
+        sc.partial_fit(X)
+    if not hasattr(sc, 'mean_'):
+        raise ValueError(f"No training rows found in {DATA_PATH}")
+
+    # Save scaler for later use
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    scaler_path = os.path.join(MODELS_DIR, 'scaler.pkl')
+    joblib.dump(sc, scaler_path)
+    return sc
+
+def _batches(sc, validation, batch_size, buffer_size, shuffle,
+             validation_fraction, chunksize):
+    """
+    Yield scaled (X, y) minibatches, shuffling within a buffer of at most
+    buffer_size rows so memory stays bounded by buffer_size + chunksize.
+    """
+    rng = np.random.default_rng()
+    buf_X = np.empty((0, N_FEATURES), dtype=np.float32)
+    buf_y = np.empty(0, dtype=np.float32)
+    for X, y in _split_chunks(validation, validation_fraction, chunksize):
+        buf_X = np.concatenate([buf_X, sc.transform(X).astype(np.float32)])
+        buf_y = np.concatenate([buf_y, y.to_numpy(dtype=np.float32)])
+        if shuffle:
+            order = rng.permutation(len(buf_y))
+            buf_X, buf_y = buf_X[order], buf_y[order]
+        # Emit whole batches while keeping buffer_size rows back to mix with the next chunk
+        keep = buffer_size if shuffle else 0
+        n_emit = max(len(buf_y) - keep, 0) // batch_size * batch_size
+        for start in range(0, n_emit, batch_size):
+            yield buf_X[start:start + batch_size], buf_y[start:start + batch_size]
+        buf_X, buf_y = buf_X[n_emit:], buf_y[n_emit:]
+    # Flush what is left in the buffer
+    for start in range(0, len(buf_y), batch_size):
+        yield buf_X[start:start + batch_size], buf_y[start:start + batch_size]
+
+def _prefetch(iterator, depth):
+    """
+    Run an iterator in a background thread, keeping up to depth items ready
+    """
+    q = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Let the worker exit if the consumer stops early
+        stop.set()
+
+def stream_batches(sc, validation=False, batch_size=STREAM_BATCH_SIZE,
+                   buffer_size=STREAM_BUFFER_SIZE, prefetch=STREAM_PREFETCH,
+                   validation_fraction=VALIDATION_FRACTION, chunksize=STREAM_CHUNKSIZE):
+    """
+    Stream scaled minibatches of the training (shuffled) or validation split
+    from disk, prefetched in a background thread
+    """
+    batches = _batches(sc, validation, batch_size, buffer_size, not validation,
+                       validation_fraction, chunksize)
+    return _prefetch(batches, prefetch)
+
 def create_model(input_dim):
     if TF_AVAILABLE:
         model = Sequential()
@@ -118,5 +256,88 @@ def train_and_save_model():
         print(f"Sklearn model saved successfully to {skl_model_path}!")
         return clf, None
 
+def _evaluate_streaming(predict, sc, batch_size, validation_fraction, chunksize):
+    # Accumulate a confusion matrix over the validation stream
+    cm = np.zeros((2, 2), dtype=np.int64)
+    for X, y in stream_batches(sc, validation=True, batch_size=batch_size,
+                               validation_fraction=validation_fraction, chunksize=chunksize):
+        y_pred = predict(X)
+        cm += confusion_matrix(y.astype("int32"), y_pred, labels=[0, 1])
+    total = cm.sum()
+    accuracy = np.trace(cm) / total if total else float('nan')
+    print("Accuracy:", accuracy)
+    print("\nConfusion Matrix:")
+    print(cm)
+    return accuracy
+
+def train_and_save_model_streaming(epochs=100, batch_size=STREAM_BATCH_SIZE,
+                                   buffer_size=STREAM_BUFFER_SIZE,
+                                   validation_fraction=VALIDATION_FRACTION,
+                                   chunksize=STREAM_CHUNKSIZE):
+    """
+    Train on datasets larger than memory by streaming minibatches from disk
+    """
+    sc = fit_scaler_streaming(validation_fraction, chunksize)
+
+    def train_stream():
+        return stream_batches(sc, batch_size=batch_size, buffer_size=buffer_size,
+                              validation_fraction=validation_fraction, chunksize=chunksize)
+
+    def val_stream():
+        return stream_batches(sc, validation=True, batch_size=batch_size,
+                              validation_fraction=validation_fraction, chunksize=chunksize)
+
+    if TF_AVAILABLE:
+        # tf.data re-invokes the generators every epoch
+        signature = (tf.TensorSpec(shape=(None, N_FEATURES), dtype=tf.float32),
+                     tf.TensorSpec(shape=(None,), dtype=tf.float32))
+        train_ds = tf.data.Dataset.from_generator(train_stream, output_signature=signature)
+        val_ds = tf.data.Dataset.from_generator(val_stream, output_signature=signature)
+        # Create model
+        model = create_model(N_FEATURES)
+        # Define early stopping
+        early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+        # Train model
+        history = model.fit(train_ds.prefetch(tf.data.AUTOTUNE),
+                            validation_data=val_ds.prefetch(tf.data.AUTOTUNE),
+                            epochs=epochs,
+                            callbacks=[early_stop],
+                            verbose=1)
+        # Evaluate model
+        _evaluate_streaming(lambda X: (model.predict(X, verbose=0).ravel() > 0.5).astype("int32"),
+                            sc, batch_size, validation_fraction, chunksize)
+        # Save model
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        model_path = os.path.join(MODELS_DIR, 'heart_disease_model.h5')
+        model.save(model_path)
+        print(f"Keras model saved successfully to {model_path}!")
+        return model, history
+    else:
+        # LogisticRegression cannot learn incrementally; use an SGD logistic model instead
+        clf = SGDClassifier(loss='log_loss', random_state=42)
+        classes = np.array([0, 1])
+        for epoch in range(epochs):
+            for X, y in train_stream():
+                clf.partial_fit(X, y.astype("int32"), classes=classes)
+        _evaluate_streaming(clf.predict, sc, batch_size, validation_fraction, chunksize)
+        # Save sklearn model
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        skl_model_path = os.path.join(MODELS_DIR, 'sklearn_model.joblib')
+        joblib.dump(clf, skl_model_path)
+        print(f"Sklearn model saved successfully to {skl_model_path}!")
+        return clf, None
+
 if __name__ == '__main__':
-    train_and_save_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the heart disease prediction model")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Stream the dataset from disk in chunks instead of loading it into memory")
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=STREAM_BATCH_SIZE)
+    parser.add_argument('--buffer-size', type=int, default=STREAM_BUFFER_SIZE)
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNKSIZE)
+    args = parser.parse_args()
+    if args.streaming:
+        train_and_save_model_streaming(epochs=args.epochs, batch_size=args.batch_size,
+                                       buffer_size=args.buffer_size, chunksize=args.chunksize)
+    else:
+        train_and_save_model()
\ No newline at end of file